@@ -1,9 +0,0 @@
-import os
-import sys
-
-CURRENT_DIR = os.path.dirname(__file__)
-SRC_DIR = os.path.join(CURRENT_DIR, "src")
-if SRC_DIR not in sys.path:
-    sys.path.append(SRC_DIR)
-
-from plaque_risk_explorer.main import app  # noqa: F401, E402
@@ -1,6 +1,10 @@
+import asyncio
+import functools
+import json
 import os
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from autogluon.tabular import TabularPredictor
 from pandas.api.types import is_numeric_dtype
@@ -24,6 +28,20 @@ FEATURES = [
 ]
 
 _LABEL = "adverse_outcome"
+# Numeric inputs are scored in float32: TabPFN preprocessing works in float32
+# anyway, and halving the dtype halves memory traffic in feature transforms
+_NUMERIC_FEATURES = [
+    "age",
+    "angina_functional_class",
+    "cholesterol_level",
+    "bmi",
+    "lvef_percent",
+    "syntax_score",
+    "ffr",
+    "plaque_volume_percent",
+    "lumen_area",
+]
+_INFERENCE_DTYPE = np.float32
 _DEFAULT_REFERENCE_PROFILE = {
     "gender": "male",
     "age": 62,
@@ -84,77 +102,144 @@ def _batch_predict_proba(
     rows: list[dict[str, object]],
 ) -> list[float]:
     frame = pd.DataFrame(rows, columns=FEATURES)
+    frame[_NUMERIC_FEATURES] = frame[_NUMERIC_FEATURES].astype(_INFERENCE_DTYPE)
     probabilities = predictor.predict_proba(frame)
     return _extract_positive_proba(probabilities)
 
 
 def _build_reference_profile(baseline_df: pd.DataFrame) -> dict[str, object]:
+    num_cols = [
+        feature
+        for feature in FEATURES
+        if feature in baseline_df.columns and is_numeric_dtype(baseline_df[feature])
+    ]
+    cat_cols = [
+        feature
+        for feature in FEATURES
+        if feature in baseline_df.columns and feature not in num_cols
+    ]
+
+    # Two bulk reductions instead of one median()/mode() dispatch per feature
+    medians = baseline_df[num_cols].median() if num_cols else pd.Series(dtype=float)
+    modes = baseline_df[cat_cols].mode(dropna=True) if cat_cols else pd.DataFrame()
+
     reference: dict[str, object] = {}
     for feature in FEATURES:
         fallback = _DEFAULT_REFERENCE_PROFILE[feature]
-        if feature not in baseline_df.columns:
-            reference[feature] = fallback
-            continue
-
-        values = baseline_df[feature].dropna()
-        if values.empty:
-            reference[feature] = fallback
-            continue
-
-        if is_numeric_dtype(values):
-            median = float(values.median())
-            if feature in _INT_REFERENCE_FEATURES:
+        if feature in num_cols:
+            median = medians[feature]
+            if pd.isna(median):
+                reference[feature] = fallback
+            elif feature in _INT_REFERENCE_FEATURES:
                 reference[feature] = int(round(median))
             elif feature == "ffr":
-                reference[feature] = round(median, 2)
+                reference[feature] = round(float(median), 2)
             else:
-                reference[feature] = round(median, 3)
-            continue
-
-        mode = values.mode(dropna=True)
-        reference[feature] = mode.iloc[0] if not mode.empty else values.iloc[0]
+                reference[feature] = round(float(median), 3)
+        elif feature in cat_cols:
+            mode = modes[feature].dropna() if feature in modes else modes
+            reference[feature] = mode.iloc[0] if not mode.empty else fallback
+        else:
+            reference[feature] = fallback
 
     return reference
 
 
-def load_predictor(model_dir: Path) -> tuple[TabularPredictor, dict[str, object]]:
+@functools.lru_cache(maxsize=8)
+def _cached_reference_profile(baseline_path: str, mtime: float) -> dict[str, object]:
+    if not mtime:
+        baseline_df = pd.DataFrame([_DEFAULT_REFERENCE_PROFILE])
+    elif baseline_path.endswith(".parquet"):
+        baseline_df = pd.read_parquet(baseline_path, columns=FEATURES)
+    else:
+        baseline_df = pd.read_csv(baseline_path, usecols=FEATURES)
+    return _build_reference_profile(baseline_df)
+
+
+def _load_reference_profile(model_dir: Path, target_dir: Path) -> dict[str, object]:
+    # A profile persisted next to the model wins: a few KB of JSON instead of
+    # re-scanning the baseline dataset and redoing the median/mode reductions
+    profile_path = target_dir / "reference_profile.json"
+    if profile_path.exists():
+        persisted = json.loads(profile_path.read_text())
+        if isinstance(persisted, dict) and set(FEATURES) <= set(persisted):
+            return {feature: persisted[feature] for feature in FEATURES}
+
+    # Prefer the Parquet build artifact when present; fall back to CSV
+    data_dir = model_dir.parent / "data"
+    baseline_path = data_dir / "features.parquet"
+    if not baseline_path.exists():
+        baseline_path = data_dir / "features.csv"
+    # Keyed on mtime so an updated baseline file still invalidates the cache
+    mtime = baseline_path.stat().st_mtime if baseline_path.exists() else 0.0
+    reference_profile = dict(_cached_reference_profile(str(baseline_path), mtime))
+
+    try:
+        profile_path.write_text(json.dumps(reference_profile))
+    except (OSError, TypeError):
+        # Read-only model dir or non-serializable mode value: keep serving
+        # from the computed profile
+        pass
+    return reference_profile
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_predictor(target_dir: str) -> TabularPredictor:
+    predictor = TabularPredictor.load(target_dir)
+    try:
+        # Pin the bagged models in memory; otherwise AutoGluon lazily
+        # (re)loads model artifacts from disk inside predict_proba
+        predictor.persist()
+    except Exception:
+        # Best effort: prediction works either way, just with lazy loading
+        pass
+    return predictor
+
+
+def load_predictor(
+    model_dir: Path,
+) -> tuple[TabularPredictor, dict[str, object], float]:
     model_name = os.getenv("MODEL_NAME", "tabpfn_adasyn")
     target_dir = model_dir / model_name
-    predictor = TabularPredictor.load(str(target_dir))
+    predictor = _cached_predictor(str(target_dir))
 
-    baseline_csv = model_dir.parent / "data" / "features.csv"
-    baseline_df = (
-        pd.read_csv(baseline_csv)
-        if baseline_csv.exists()
-        else pd.DataFrame([_DEFAULT_REFERENCE_PROFILE])
-    )
-    return predictor, _build_reference_profile(baseline_df)
+    reference_profile = _load_reference_profile(model_dir, target_dir)
+    # The reference profile is fixed for the lifetime of the predictor, so its
+    # probability is scored once here instead of on every predict() call.
+    baseline_probability = _batch_predict_proba(predictor, [dict(reference_profile)])[0]
+    return predictor, reference_profile, baseline_probability
 
 
-def predict(
-    predictor: TabularPredictor,
+def _build_rows(
+    patient_profile: dict[str, object],
     reference_profile: dict[str, object],
-    features: dict[str, object],
-) -> tuple[float, int, dict[str, object]]:
-    patient_profile = {feature: features.get(feature) for feature in FEATURES}
-
-    # Build all rows in one batch: patient, baseline, + 15 counterfactuals
-    rows: list[dict[str, object]] = [patient_profile, dict(reference_profile)]
+) -> list[dict[str, object]]:
+    # One batch per request: patient + 15 counterfactuals
+    rows: list[dict[str, object]] = [patient_profile]
     for feature in FEATURES:
         counterfactual = dict(patient_profile)
         counterfactual[feature] = reference_profile.get(feature)
         rows.append(counterfactual)
+    return rows
 
-    # Single predict_proba call for all 17 rows
-    all_proba = _batch_predict_proba(predictor, rows)
 
+def _assemble_prediction(
+    patient_profile: dict[str, object],
+    reference_profile: dict[str, object],
+    baseline_probability: float,
+    all_proba: list[float],
+) -> tuple[float, int, dict[str, object]]:
     probability = all_proba[0]
-    baseline_probability = all_proba[1]
-    counterfactual_probas = all_proba[2:]
 
-    scored_effects: list[tuple[float, dict[str, object]]] = []
-    for i, feature in enumerate(FEATURES):
-        effect = round(probability - counterfactual_probas[i], 4)
+    # Vectorized effect computation and ordering: one subtraction and one
+    # argsort in C instead of a keyed Python sort
+    effects = np.round(probability - np.asarray(all_proba[1:]), 4)
+    order = np.argsort(-np.abs(effects), kind="stable")
+
+    feature_effects: list[dict[str, object]] = []
+    for i in order:
+        feature = FEATURES[i]
+        effect = float(effects[i])
 
         direction = "neutral"
         if effect > 0:
@@ -162,26 +247,137 @@ def predict(
         elif effect < 0:
             direction = "decrease"
 
-        scored_effects.append(
-            (
-                abs(effect),
-                {
-                    "feature": feature,
-                    "effect": effect,
-                    "direction": direction,
-                    "patient_value": _serialize(patient_profile.get(feature)),
-                    "reference_value": _serialize(reference_profile.get(feature)),
-                },
-            ),
+        feature_effects.append(
+            {
+                "feature": feature,
+                "effect": effect,
+                "direction": direction,
+                "patient_value": _serialize(patient_profile.get(feature)),
+                "reference_value": _serialize(reference_profile.get(feature)),
+            },
         )
-
-    feature_effects = [
-        effect
-        for _, effect in sorted(scored_effects, key=lambda item: item[0], reverse=True)
-    ]
     explanation = {
         "method": "counterfactual_single_feature_delta",
         "baseline_probability": round(baseline_probability, 3),
         "feature_effects": feature_effects,
     }
     return round(probability, 3), int(probability >= 0.5), explanation
+
+
+def predict(
+    predictor: TabularPredictor,
+    reference_profile: dict[str, object],
+    baseline_probability: float,
+    features: dict[str, object],
+) -> tuple[float, int, dict[str, object]]:
+    patient_profile = {feature: features.get(feature) for feature in FEATURES}
+    rows = _build_rows(patient_profile, reference_profile)
+    # Single predict_proba call for all 16 rows
+    all_proba = _batch_predict_proba(predictor, rows)
+    return _assemble_prediction(
+        patient_profile,
+        reference_profile,
+        baseline_probability,
+        all_proba,
+    )
+
+
+class PredictProbaBatcher:
+    """Coalesce concurrent predict_proba calls into one batched invocation.
+
+    Each request contributes its rows and awaits a future; pending rows are
+    flushed as a single DataFrame once ``max_rows`` accumulate or after
+    ``max_delay`` seconds, whichever comes first, and the probabilities are
+    demultiplexed back to the callers.
+    """
+
+    def __init__(
+        self,
+        predictor: TabularPredictor,
+        *,
+        max_delay: float = 0.01,
+        max_rows: int = 64,
+    ):
+        self.predictor = predictor
+        self.max_delay = max_delay
+        self.max_rows = max_rows
+        self._pending: list[tuple[list[dict[str, object]], asyncio.Future]] = []
+        self._pending_rows = 0
+        self._flush_task: asyncio.Task | None = None
+        # The event loop only holds tasks weakly; keeping strong references
+        # here stops in-flight batches from being garbage-collected while
+        # suspended, which would abandon every waiter in the batch
+        self._batch_tasks: set[asyncio.Task] = set()
+
+    async def predict_proba(self, rows: list[dict[str, object]]) -> list[float]:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((rows, future))
+        self._pending_rows += len(rows)
+
+        if self._pending_rows >= self.max_rows:
+            self._flush()
+        elif self._flush_task is None:
+            self._flush_task = loop.create_task(self._delayed_flush())
+        return await future
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self.max_delay)
+        self._flush_task = None
+        self._flush()
+
+    def _flush(self) -> None:
+        flush_task, self._flush_task = self._flush_task, None
+        if flush_task is not None and flush_task is not asyncio.current_task():
+            flush_task.cancel()
+
+        batch, self._pending = self._pending, []
+        self._pending_rows = 0
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(
+        self,
+        batch: list[tuple[list[dict[str, object]], asyncio.Future]],
+    ) -> None:
+        all_rows = [row for rows, _ in batch for row in rows]
+        try:
+            # Run the blocking AutoGluon call in a worker thread so the event
+            # loop keeps accepting (and coalescing) requests meanwhile
+            probabilities = await asyncio.to_thread(
+                _batch_predict_proba,
+                self.predictor,
+                all_rows,
+            )
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        offset = 0
+        for rows, future in batch:
+            chunk = probabilities[offset : offset + len(rows)]
+            offset += len(rows)
+            if not future.done():
+                future.set_result(chunk)
+
+
+async def predict_async(
+    batcher: PredictProbaBatcher,
+    reference_profile: dict[str, object],
+    baseline_probability: float,
+    features: dict[str, object],
+) -> tuple[float, int, dict[str, object]]:
+    patient_profile = {feature: features.get(feature) for feature in FEATURES}
+    rows = _build_rows(patient_profile, reference_profile)
+    all_proba = await batcher.predict_proba(rows)
+    return _assemble_prediction(
+        patient_profile,
+        reference_profile,
+        baseline_probability,
+        all_proba,
+    )
@@ -1,4 +1,5 @@
 import logging
+from typing import Any, Protocol
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -6,6 +7,7 @@ import pandas as pd
 from data_loader import MyDataLoader
 from imblearn.over_sampling import ADASYN, SMOTE, SMOTENC, RandomOverSampler
 from imblearn.under_sampling import RandomUnderSampler
+from sklearn.neighbors import NearestNeighbors
 
 logging.basicConfig(
     level=logging.INFO,
@@ -14,6 +16,66 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class _Sampler(Protocol):
+    """
+    Structural interface shared by the imblearn samplers and
+    FullCoverageOverSampler: resampling plus, for the samplers that track
+    them, the positions of the rows they emitted.
+    """
+
+    sample_indices_: Any
+
+    def fit_resample(self, X, y) -> Any: ...
+
+
+class FullCoverageOverSampler:
+    """
+    Oversampler that emits every row of each class once, then tops up to the
+    target count by sampling the remainder without replacement.
+
+    Unlike RandomOverSampler's sampling-with-replacement, no original row can
+    be missed. Exposes `sample_indices_` like the imblearn samplers so the
+    'new'-mode synthetic filtering keeps working.
+    """
+
+    def __init__(self, sampling_strategy: str | dict = "auto", random_state=None):
+        self.sampling_strategy = sampling_strategy
+        self.random_state = random_state
+        self.sample_indices_: np.ndarray | None = None
+
+    def fit_resample(self, X, y):
+        rng = np.random.default_rng(self.random_state)
+        y_values = np.asarray(y)
+        positions = np.arange(len(y_values))
+        counts = pd.Series(y_values).value_counts()
+        majority = int(counts.max())
+
+        index_blocks = []
+        for cls, count in counts.items():
+            cls_idx = positions[y_values == cls]
+            if isinstance(self.sampling_strategy, dict):
+                target = int(self.sampling_strategy.get(cls, count))
+            else:
+                target = majority
+            target = max(target, count)
+            reps, remainder = divmod(target, count)
+            block = np.tile(cls_idx, reps)
+            if remainder:
+                block = np.concatenate(
+                    [block, rng.choice(cls_idx, remainder, replace=False)],
+                )
+            index_blocks.append(block)
+
+        self.sample_indices_ = np.concatenate(index_blocks)
+        if isinstance(X, pd.DataFrame):
+            x_res = X.take(self.sample_indices_, axis=0).reset_index(drop=True)
+            y_res = y.take(self.sample_indices_).reset_index(drop=True)
+        else:
+            x_res = X[self.sample_indices_]
+            y_res = y_values[self.sample_indices_]
+        return x_res, y_res
+
+
 class DataSampling:
     def __init__(self, X, Y, data_types, sampling_mode: str = "append"):
         """
@@ -27,12 +89,18 @@ class DataSampling:
         self.X = X
         self.Y = Y
         self.orig_len = len(X)
-        self.x = None
-        self.y = None
+        self.x: pd.DataFrame | None = None
+        self.y: pd.Series | None = None
         self.data_types = data_types
-        self.sampler = None
+        # imblearn samplers and FullCoverageOverSampler share no base class,
+        # so the attribute is typed structurally via the _Sampler protocol
+        self.sampler: _Sampler | None = None
         self.sampler_method: str | None = None
         self.sampling_mode = sampling_mode  # 'append' (default) or 'new'
+        self.n_jobs = -1
+        self._synthetic_idx: np.ndarray | None = None
+        self._orig_counts: pd.Series | None = None
+        self._res_counts: pd.Series | None = None
 
     def check_intersection_with_original(self):
         """
@@ -74,16 +142,19 @@ class DataSampling:
         sampling_strategy: str | dict = "not minority",
         categorical_features=None,
         k_neighbors: int = 5,
+        n_jobs: int = -1,
     ):
         """
         Initialize the sampler object based on the specified method and strategy.
         Args:
-            method: Sampling method ('under', 'over', 'smote', 'adasyn').
+            method: Sampling method ('under', 'over', 'over_full', 'smote', 'adasyn').
             sampling_strategy: Strategy for sampling (e.g., 'auto', 'not minority', or dict).
             categorical_features: List of categorical feature indices for SMOTENC.
             k_neighbors: Number of nearest neighbors to use for over-sampling (e.g. for SMOTE).
+            n_jobs: Parallelism for the neighbor search inside SMOTE/ADASYN (-1 = all cores).
         """
         self.sampler_method = method
+        self.n_jobs = n_jobs
         match method:
             case "under":
                 self.sampler = RandomUnderSampler(
@@ -101,9 +172,22 @@ class DataSampling:
                 logger.info(
                     f"RandomOverSampler initialized with sampling_strategy='{sampling_strategy}'",
                 )
+            case "over_full":
+                self.sampler = FullCoverageOverSampler(
+                    sampling_strategy=sampling_strategy,
+                    random_state=42,
+                )
+                logger.info(
+                    f"FullCoverageOverSampler initialized with sampling_strategy='{sampling_strategy}'",
+                )
             case "smote":
                 # Ensure k_neighbors is compatible with the number of samples in minority class
-                min_class_size = self.Y.value_counts().min()
+                min_class_size = int(self._target_counts().min())
+                if min_class_size < 2:
+                    raise ValueError(
+                        f"Minority class has only {min_class_size} sample(s); "
+                        f"SMOTE/SMOTENC needs at least 2 to interpolate neighbors.",
+                    )
                 adj_k = min(k_neighbors, min_class_size - 1)
                 if adj_k < 1:
                     adj_k = 1
@@ -111,36 +195,63 @@ class DataSampling:
                         f"Class size {min_class_size} is too small. Setting k_neighbors to 1.",
                     )
 
+                # Pass a parallel NearestNeighbors estimator: the KNN search
+                # dominates SMOTE/ADASYN runtime and scales with cores
+                nn = NearestNeighbors(n_neighbors=adj_k + 1, n_jobs=n_jobs)
                 if categorical_features is not None and len(categorical_features) > 0:
                     self.sampler = SMOTENC(
                         categorical_features=categorical_features,
                         sampling_strategy=sampling_strategy,
                         random_state=42,
-                        k_neighbors=adj_k,
+                        k_neighbors=nn,
                     )
                     logger.info(
-                        f"SMOTENC initialized with categorical_features={categorical_features}, k_neighbors={adj_k} and sampling_strategy='{sampling_strategy}'",
+                        f"SMOTENC initialized with categorical_features={categorical_features}, k_neighbors={adj_k} (n_jobs={n_jobs}) and sampling_strategy='{sampling_strategy}'",
                     )
                 else:
                     self.sampler = SMOTE(
                         sampling_strategy=sampling_strategy,
                         random_state=42,
-                        k_neighbors=adj_k,
+                        k_neighbors=nn,
                     )
                     logger.info(
-                        f"SMOTE initialized with k_neighbors={adj_k} and sampling_strategy='{sampling_strategy}'",
+                        f"SMOTE initialized with k_neighbors={adj_k} (n_jobs={n_jobs}) and sampling_strategy='{sampling_strategy}'",
                     )
             case "adasyn":
                 self.sampler = ADASYN(
                     sampling_strategy=sampling_strategy,
                     random_state=42,
+                    n_neighbors=NearestNeighbors(n_neighbors=6, n_jobs=n_jobs),
                 )
                 logger.info(
-                    f"ADASYN initialized with sampling_strategy='{sampling_strategy}'",
+                    f"ADASYN initialized with sampling_strategy='{sampling_strategy}' (n_jobs={n_jobs})",
                 )
             case _:
                 raise ValueError(f"Unsupported sampling method: {method}")
 
+    def _optimize_dtypes(self):
+        """
+        Downcast numeric columns and convert low-cardinality object columns to
+        category before fit_resample, shrinking the copies imblearn makes
+        (SMOTENC in particular expands everything to float64 internally).
+        """
+        if not isinstance(self.X, pd.DataFrame):
+            return
+        memory_before = self.X.memory_usage(deep=True).sum()
+        for col in self.X.columns:
+            values = self.X[col]
+            if values.dtype == object:
+                if values.nunique() / max(len(values), 1) < 0.5:
+                    self.X[col] = values.astype("category")
+            elif pd.api.types.is_float_dtype(values):
+                self.X[col] = pd.to_numeric(values, downcast="float")
+            elif pd.api.types.is_integer_dtype(values):
+                self.X[col] = pd.to_numeric(values, downcast="integer")
+        memory_after = self.X.memory_usage(deep=True).sum()
+        logger.info(
+            f"Feature matrix memory reduced from {memory_before} to {memory_after} bytes before resampling",
+        )
+
     def resample_data(self, n_target: int = 300, max_iter: int = 20):
         """
         Generate unique synthetic rows, casting types to match originals and removing duplicates.
@@ -152,6 +263,9 @@ class DataSampling:
                 "Sampler not set. Please call get_sampler() to set the sampling method before plotting.",
             )
 
+        self._optimize_dtypes()
+        self._synthetic_idx = None
+
         orig_df = pd.concat(
             [self.X.reset_index(drop=True), self.Y.reset_index(drop=True)],
             axis=1,
@@ -159,7 +273,7 @@ class DataSampling:
         orig_df = orig_df.astype(self.data_types.to_dict())
         orig_set = {tuple(row) for row in orig_df.values}
 
-        unique_synth = []
+        unique_synth: list[tuple] = []
         synth_columns = list(self.X.columns) + [
             self.Y.name if self.Y.name else "target",
         ]
@@ -189,7 +303,7 @@ class DataSampling:
             if adasyn_with_cat:
                 # Sample using numeric features only
                 x_num = self.X[numeric_cols]
-                min_class_size = self.Y.value_counts().min()
+                min_class_size = self._target_counts().min()
                 adj_k = min(5, min_class_size - 1)
                 if adj_k < 1:
                     adj_k = 1
@@ -199,7 +313,10 @@ class DataSampling:
                 sampler_num = ADASYN(
                     sampling_strategy="auto",
                     random_state=42,
-                    n_neighbors=adj_k,
+                    n_neighbors=NearestNeighbors(
+                        n_neighbors=adj_k + 1,
+                        n_jobs=self.n_jobs,
+                    ),
                 )
                 x_res, y_res = sampler_num.fit_resample(x_num, self.Y)
                 # Build dataframe with numeric columns + target
@@ -255,6 +372,7 @@ class DataSampling:
         synth_df = pd.DataFrame(unique_synth, columns=synth_columns)
         self.x = synth_df.drop(columns=[self.Y.name if self.Y.name else "target"])
         self.y = synth_df[self.Y.name if self.Y.name else "target"]
+        self._res_counts = self.y.value_counts()
         logger.info(f"Final unique synthetic shape: {self.x.shape}, {self.y.shape}")
 
     def export_csv(
@@ -273,25 +391,57 @@ class DataSampling:
         if self.x is None or self.y is None:
             raise ValueError("No resampled data available. Call resample_data() first.")
 
-        df = pd.concat(
-            [
-                pd.DataFrame(self.x),
-                pd.Series(
-                    self.y,
-                    name=self.y.name if self.y.name else "adverse_outcome",
-                ),
-            ],
-            axis=1,
-        )
+        # In-place column assign instead of a concat that reallocates the
+        # whole dataset through the block manager
+        df = self.x.copy() if isinstance(self.x, pd.DataFrame) else pd.DataFrame(self.x)
+        df[self.y.name if self.y.name else "adverse_outcome"] = np.asarray(self.y)
         if val_round is not None:
-            float_cols = df.select_dtypes(include=["float"]).columns
+            float_cols = df.select_dtypes(include=["floating"]).columns
             df[float_cols] = df[float_cols].round(val_round)
         df = df.astype(self.data_types.to_dict())
-        df.to_csv(path, index=include_index)
+        self._write_csv(df, path, include_index, val_round)
         logger.info(
             f"Data exported to '{path}', rows={len(df)}, include_index={include_index}",
         )
 
+    @staticmethod
+    def _write_csv(df, path: str, include_index: bool, val_round: int | None):
+        """
+        Write the CSV through pyarrow's columnar C writer when it is available
+        and no rounding was requested; rounded frames go through pandas'
+        writer so the float repr matches the checked-in artifacts.
+        """
+        if val_round is None:
+            try:
+                import pyarrow as pa
+                import pyarrow.csv as pa_csv
+            except ImportError:
+                pass
+            else:
+                pa_csv.write_csv(
+                    pa.Table.from_pandas(df, preserve_index=include_index),
+                    path,
+                )
+                return
+        df.to_csv(path, index=include_index)
+
+    def _target_counts(self) -> pd.Series:
+        """Class counts of the original target, computed once and cached."""
+        if self._orig_counts is None:
+            self._orig_counts = self.Y.value_counts()
+        return self._orig_counts
+
+    def _synthetic_indices(self) -> np.ndarray:
+        """
+        Positions of purely synthetic rows in the resampled output, computed
+        with a single numpy mask and cached until the next resample.
+        """
+        if self._synthetic_idx is None:
+            assert self.sampler is not None
+            idx = np.asarray(self.sampler.sample_indices_)
+            self._synthetic_idx = idx[idx >= self.orig_len]
+        return self._synthetic_idx
+
     def data_plot(
         self,
         ncols: int = 2,
@@ -309,12 +459,15 @@ class DataSampling:
         """
         if self.Y is not None and self.y is not None:
             fig, axs = plt.subplots(ncols=ncols, figsize=figsize)
-            y_source = self.Y
-            y_res = self.y
+            res_counts = (
+                self._res_counts
+                if self._res_counts is not None
+                else self.y.value_counts()
+            )
 
-            y_source.value_counts().plot.pie(autopct=autopct, ax=axs[0])
+            self._target_counts().plot.pie(autopct=autopct, ax=axs[0])
             axs[0].set_title("Original data")
-            y_res.value_counts().plot.pie(autopct=autopct, ax=axs[1])
+            res_counts.plot.pie(autopct=autopct, ax=axs[1])
             axs[1].set_title(f"{self.sampler_method}-sampling")
             return fig, axs
         else:
@@ -353,37 +506,47 @@ class DataSampling:
             if self.sampling_mode == "new":
                 # Synthetic only
                 if hasattr(self.sampler, "sample_indices_"):
-                    orig_len = len(self.X)
-                    synthetic_mask = [
-                        idx for idx in self.sampler.sample_indices_ if idx >= orig_len
-                    ]
+                    synthetic_mask = self._synthetic_indices()
                     syn_vals = (
-                        self.x.iloc[synthetic_mask][feat]
-                        if hasattr(self.x, "iloc")
+                        self.x.take(synthetic_mask, axis=0)[feat]
+                        if hasattr(self.x, "take")
                         else self.x[synthetic_mask, self.x.columns.get_loc(feat)]
                     )
                 else:
                     syn_vals = self.x[feat] if hasattr(self.x, "__getitem__") else None
-                axs[i].hist(real_vals, bins=20, alpha=0.5, label="Real", color="blue")
-                axs[i].hist(
-                    syn_vals,
-                    bins=20,
-                    alpha=0.5,
-                    label="Synthetic",
-                    color="orange",
-                )
+                syn_label, syn_color = "Synthetic", "orange"
                 axs[i].set_title(f"{feat}: Real vs Synthetic (new mode)")
             else:
                 syn_vals = self.x[feat] if hasattr(self.x, "__getitem__") else None
-                axs[i].hist(real_vals, bins=20, alpha=0.5, label="Real", color="blue")
-                axs[i].hist(
-                    syn_vals,
-                    bins=20,
-                    alpha=0.5,
-                    label="Resampled",
-                    color="green",
-                )
+                syn_label, syn_color = "Resampled", "green"
                 axs[i].set_title(f"{feat}: Real vs Resampled (append mode)")
+
+            # Bin in C with np.histogram on shared edges and draw the
+            # precomputed counts; matplotlib's hist() re-bins in Python
+            real_arr = np.asarray(real_vals, dtype=np.float32)
+            syn_arr = np.asarray(syn_vals, dtype=np.float32)
+            bins = np.histogram_bin_edges(
+                np.concatenate([real_arr, syn_arr]),
+                bins=20,
+            )
+            real_counts, _ = np.histogram(real_arr, bins)
+            syn_counts, _ = np.histogram(syn_arr, bins)
+            axs[i].stairs(
+                real_counts,
+                bins,
+                fill=True,
+                alpha=0.5,
+                label="Real",
+                color="blue",
+            )
+            axs[i].stairs(
+                syn_counts,
+                bins,
+                fill=True,
+                alpha=0.5,
+                label=syn_label,
+                color=syn_color,
+            )
             axs[i].legend()
             axs[i].set_xlabel(feat)
             axs[i].set_ylabel("Count")
@@ -405,18 +568,18 @@ if __name__ == "__main__":
     # Improved categorical features detection
     categorical_features = []
     if isinstance(X, pd.DataFrame):
+        # Object/Category dtypes via select_dtypes; binary/ordinal int
+        # columns with few unique values via one bulk nunique() reduction
+        cat_cols = set(X.select_dtypes(include=["object", "category"]).columns)
+        int_cols = X.select_dtypes(include=["integer"]).columns
+        if len(int_cols):
+            int_nunique = X[int_cols].nunique()
+            cat_cols.update(int_nunique.index[int_nunique <= 4])
         for i, col in enumerate(X.columns):
-            dt = X[col].dtype
-            nunique = X[col].nunique()
-            # Object/Category types or Binary/Ordinal columns with few unique values
-            if (
-                dt == "object"
-                or str(dt).startswith("category")
-                or (str(dt).startswith("int") and nunique <= 4)
-            ):
+            if col in cat_cols:
                 categorical_features.append(i)
                 logger.info(
-                    f"Feature '{col}' (index {i}) identified as categorical (nunique={nunique})",
+                    f"Feature '{col}' (index {i}) identified as categorical (nunique={X[col].nunique()})",
                 )
 
     # For SMOTE: use dict sampling_strategy for class balancing
@@ -1,7 +1,15 @@
+import argparse
+import atexit
 import datetime
 import logging
+import os
+import shutil
+import tempfile
 
+import numpy as np
+import pandas as pd
 from autogluon.tabular import TabularDataset, TabularPredictor
+from joblib import Parallel, delayed
 from sklearn.metrics import average_precision_score, roc_auc_score
 from sklearn.model_selection import LeaveOneOut, StratifiedKFold, train_test_split
 
@@ -21,6 +29,88 @@ logger.setLevel(logging.INFO)
 logger.addHandler(file_handler)
 
 
+def _scratch_dir() -> str | None:
+    """Pick the fold-scratch location: tmpfs when it has headroom, else disk.
+
+    Bagged TabPFN fold artifacts are large; on a small /dev/shm they can
+    ENOSPC where plain disk would not, so tmpfs is only used with at least
+    2 GiB free.
+    """
+    if not os.path.isdir("/dev/shm"):
+        return None
+    if shutil.disk_usage("/dev/shm").free < 2 * 1024**3:
+        return None
+    return "/dev/shm"
+
+
+def _one_bootstrap(
+    i,
+    x_np,
+    y_np,
+    feature_cols,
+    feature_dtypes,
+    target_column,
+    model_name,
+    base_path,
+):
+    """
+    Run a single optimism-corrected bootstrap iteration: fit on a bootstrap
+    sample, score apparent (in-sample) and out-of-bag metrics.
+    Operates on shared numpy arrays (joblib shares them across workers)
+    instead of re-slicing the source DataFrame per iteration; the original
+    column dtypes are restored on each rebuilt frame so AutoGluon's type
+    inference sees the same numeric/categorical split as the real fit.
+    Returns (apparent_auc, test_auc, apparent_pr, test_pr) or None when the
+    draw leaves a degenerate class split.
+    """
+    # Draw the bootstrap sample and its out-of-bag complement with numpy:
+    # one integers() draw and one boolean mask instead of resample + two
+    # Python sets per iteration
+    n = len(y_np)
+    rng = np.random.default_rng(i)
+    boot_idx = rng.integers(0, n, n)
+    mask = np.zeros(n, dtype=bool)
+    mask[boot_idx] = True
+    oob_idx = np.flatnonzero(~mask)
+    if not len(oob_idx):
+        return None
+
+    if np.unique(y_np[boot_idx]).size < 2 or np.unique(y_np[oob_idx]).size < 2:
+        return None
+
+    train_df = pd.DataFrame(x_np[boot_idx], columns=feature_cols).astype(
+        feature_dtypes,
+    )
+    train_df[target_column] = y_np[boot_idx]
+    oob_df = pd.DataFrame(x_np[oob_idx], columns=feature_cols).astype(
+        feature_dtypes,
+    )
+    oob_df[target_column] = y_np[oob_idx]
+
+    model_path = f"{base_path}/boot_{i}"
+    predictor = TabularPredictor(
+        label=target_column,
+        eval_metric="roc_auc",
+        verbosity=0,
+        path=model_path,
+    )
+    predictor.fit(
+        train_data=TabularDataset(train_df),
+        hyperparameters={model_name: {}},
+    )
+
+    p_train = predictor.predict_proba(train_df).iloc[:, 1]
+    p_oob = predictor.predict_proba(oob_df).iloc[:, 1]
+    shutil.rmtree(model_path, ignore_errors=True)
+
+    return (
+        roc_auc_score(train_df[target_column], p_train),
+        roc_auc_score(oob_df[target_column], p_oob),
+        average_precision_score(train_df[target_column], p_train),
+        average_precision_score(oob_df[target_column], p_oob),
+    )
+
+
 class AdverseOutcomeModel:
     """Placeholder: class for loading and using the adverse outcome model."""
 
@@ -32,6 +122,16 @@ class AdverseOutcomeModel:
         self.model_name = model_name
         self.data_synthetic_method = data_synthetic_method
         self.model_path = f"backend/models/tabpfn_{self.data_synthetic_method}/{self.model_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        # Scratch dir holding the kept fold predictor; released via
+        # cleanup_scratch() once the predictor is no longer needed
+        self._cv_tmp_dir: str | None = None
+
+    def cleanup_scratch(self) -> None:
+        """Remove the CV scratch dir (tmpfs contents survive process exit)."""
+        if self._cv_tmp_dir is not None:
+            shutil.rmtree(self._cv_tmp_dir, ignore_errors=True)
+            self._cv_tmp_dir = None
+            self.tabpfnv2_predictor = None
 
     def predict(self, data):
         tabpfnv2_predictions = self.tabpfnv2_predictor.predict_proba(data)
@@ -70,7 +170,21 @@ class AdverseOutcomeModel:
         y = self.train_data[target_column]
 
         skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
-        preds, true = [], []
+        # Every sample is predicted exactly once across folds, so the
+        # collectors can be preallocated and filled by test_idx position
+        preds = np.empty(len(X), dtype=np.float64)
+        true = np.empty(len(X), dtype=np.float64)
+
+        # Fold models are scratch artifacts: fit them into a tmpfs-backed
+        # temp dir when one exists and drop each fold's directory as soon as
+        # the next fold is done, instead of persisting every fold next to
+        # the final model
+        base_tmp = tempfile.mkdtemp(prefix="ag_cv_", dir=_scratch_dir())
+        self._cv_tmp_dir = base_tmp
+        # Safety net for early exits; cleanup_scratch() is idempotent, so the
+        # explicit call in main() makes this a no-op on the normal path
+        atexit.register(self.cleanup_scratch)
+        prev_fold_path: str | None = None
 
         for i, (train_idx, test_idx) in enumerate(skf.split(X, y)):
             fold_num = i + 1
@@ -80,7 +194,7 @@ class AdverseOutcomeModel:
             test_df = self.train_data.iloc[test_idx]
 
             # Unique path for each fold to avoid overwriting
-            fold_model_path = f"{self.model_path}_fold_{fold_num}"
+            fold_model_path = f"{base_tmp}/fold_{fold_num}"
 
             predictor = TabularPredictor(
                 label=target_column,
@@ -97,27 +211,96 @@ class AdverseOutcomeModel:
 
             # Predict for ALL samples in the test fold
             proba = predictor.predict_proba(TabularDataset(test_df)).iloc[:, 1].values
-            preds.extend(proba)
-            true.extend(test_df[target_column].values)
+            preds[test_idx] = proba
+            true[test_idx] = test_df[target_column].values
 
             logger.info(f"Fold {fold_num} completed.")
-            self.evaluate_metrics(true, preds)
             self.tabpfnv2_predictor = predictor  # Keep last predictor
 
+            # The previous fold's model is no longer referenced
+            if prev_fold_path is not None:
+                shutil.rmtree(prev_fold_path, ignore_errors=True)
+            prev_fold_path = fold_model_path
+
         logger.info("StratifiedKFold finished. Final Cross-Validation Evaluation:")
         self.evaluate_metrics(true, preds)
 
         assert self.tabpfnv2_predictor is not None
         leaderboard = self.tabpfnv2_predictor.leaderboard(self.test_data, silent=False)
+        os.makedirs(self.model_path, exist_ok=True)
         leaderboard.to_excel(
-            f"{self.model_path}_fold_{n_splits}/leaderboard.xlsx",
+            f"{self.model_path}/leaderboard.xlsx",
             index=False,
         )
         logger.info(
-            f"Leaderboard saved to: {self.model_path}_fold_{n_splits}/leaderboard.xlsx",
+            f"Leaderboard saved to: {self.model_path}/leaderboard.xlsx",
         )
         logger.info(f"Leaderboard:\n{leaderboard}")
 
+    def bootstrap_validation(
+        self,
+        target_column: str,
+        n_bootstrap: int = 300,
+        n_jobs: int = -1,
+    ):
+        """
+        Optimism-corrected bootstrap validation (Harrell): fit on a bootstrap
+        sample, compare apparent vs out-of-bag performance, and average the
+        optimism over iterations. Iterations are embarrassingly parallel, so
+        they are fanned out over all cores with joblib/loky; each worker fits
+        into its own temporary model path to avoid disk collisions.
+        """
+        if self.train_data is None:
+            raise ValueError("Data not loaded. Call convert_datset() first.")
+
+        # Share one contiguous feature array and one target array across all
+        # workers; each iteration indexes into them instead of copying the
+        # DataFrame through iloc
+        feature_df = self.train_data.drop(columns=[target_column])
+        feature_cols = list(feature_df.columns)
+        # With mixed dtypes .values degrades to one object array, so each
+        # worker reapplies the original dtypes when rebuilding its frames
+        feature_dtypes = feature_df.dtypes.to_dict()
+        x_np = np.ascontiguousarray(feature_df.values)
+        y_np = np.asarray(self.train_data[target_column].values)
+
+        base_path = tempfile.mkdtemp(prefix="ag_boot_")
+        try:
+            results = Parallel(n_jobs=n_jobs, backend="loky", batch_size=1)(
+                delayed(_one_bootstrap)(
+                    i,
+                    x_np,
+                    y_np,
+                    feature_cols,
+                    feature_dtypes,
+                    target_column,
+                    self.model_name,
+                    base_path,
+                )
+                for i in range(n_bootstrap)
+            )
+        finally:
+            shutil.rmtree(base_path, ignore_errors=True)
+
+        results = [r for r in results if r is not None]
+        if not results:
+            raise RuntimeError("All bootstrap iterations were degenerate.")
+
+        metrics = np.asarray(results, dtype=np.float64)
+        apparent_aucs, test_aucs, apparent_pr, test_pr = metrics.T
+
+        summary = {
+            "n_valid": len(results),
+            "apparent_auc": float(apparent_aucs.mean()),
+            "test_auc": float(test_aucs.mean()),
+            "auc_optimism": float(np.mean(apparent_aucs - test_aucs)),
+            "apparent_pr": float(apparent_pr.mean()),
+            "test_pr": float(test_pr.mean()),
+            "pr_optimism": float(np.mean(apparent_pr - test_pr)),
+        }
+        logger.info(f"Bootstrap validation summary: {summary}")
+        return summary
+
     def evaluate_metrics(self, true, preds):
         auc = roc_auc_score(true, preds)
         pr = average_precision_score(true, preds)
@@ -126,8 +309,7 @@ class AdverseOutcomeModel:
         logger.info(f"PR-AUC: {pr}")
 
 
-if __name__ == "__main__":
-    data_synthetic_method = "smote"  # Options: "adasyn", "smote"
+def main(data_synthetic_method: str = "smote") -> None:
     # 1. Load Synthetic Train Data
     my_data_loader = MyDataLoader(
         data_path=f"backend/data/resampled_data_{data_synthetic_method}.csv",
@@ -150,47 +332,56 @@ if __name__ == "__main__":
     )
     adverse_outcome_model.convert_datset(train_data, test_data)
 
-    # 4. Run Cross-Validation on Synthetic Data (Internal Validation)
-    logger.info("Running Cross-Validation on Synthetic Data...")
-    adverse_outcome_model.train_stratified(target_column="adverse_outcome", n_splits=5)
-
-    # 5. Final Evaluation on Real Data
-    logger.info("Performing Final Evaluation on REAL data (features.csv)...")
-
-    assert adverse_outcome_model.tabpfnv2_predictor is not None
-    # Check class distribution
-    counts = test_data["adverse_outcome"].value_counts()
-    logger.info(f"Test Set Class Distribution:\n{counts}")
-
-    if len(counts) < 2:
-        logger.warning(
-            "CRITICAL: Test set has only ONE class. Metrics are meaningless.",
+    # Steps 4-6 are the only users of the kept fold predictor, which lives
+    # in the (possibly tmpfs-backed) CV scratch dir; drop that dir as soon
+    # as they are done, even when one of them raises
+    try:
+        # 4. Run Cross-Validation on Synthetic Data (Internal Validation)
+        logger.info("Running Cross-Validation on Synthetic Data...")
+        adverse_outcome_model.train_stratified(
+            target_column="adverse_outcome",
+            n_splits=5,
         )
 
-    final_probas = adverse_outcome_model.tabpfnv2_predictor.predict_proba(
-        test_data,
-    ).iloc[:, 1]
-    final_auc = roc_auc_score(test_data["adverse_outcome"], final_probas)
-    final_pr = average_precision_score(test_data["adverse_outcome"], final_probas)
+        # 5. Final Evaluation on Real Data
+        logger.info("Performing Final Evaluation on REAL data (features.csv)...")
 
-    logger.info("====== REAL WORLD TEST RESULTS ======")
-    logger.info(f"ROC-AUC on Real Data: {final_auc:.4f}")
-    logger.info(f"PR-AUC on Real Data: {final_pr:.4f}")
-    logger.info("=====================================")
+        assert adverse_outcome_model.tabpfnv2_predictor is not None
+        # Check class distribution
+        counts = test_data["adverse_outcome"].value_counts()
+        logger.info(f"Test Set Class Distribution:\n{counts}")
 
-    # 6. Investigate Feature Importance
-    try:
-        logger.info("Calculating Feature Importance (this may take a while)...")
-        importance = adverse_outcome_model.tabpfnv2_predictor.feature_importance(
+        if len(counts) < 2:
+            logger.warning(
+                "CRITICAL: Test set has only ONE class. Metrics are meaningless.",
+            )
+
+        final_probas = adverse_outcome_model.tabpfnv2_predictor.predict_proba(
             test_data,
-        )
-        logger.info(f"Feature Importance:\n{importance}")
-        importance.to_excel(
-            f"{adverse_outcome_model.model_path}_feature_importance.xlsx",
-            index=False,
-        )
-    except Exception as e:
-        logger.warning(f"Could not calculate feature importance: {e}")
+        ).iloc[:, 1]
+        final_auc = roc_auc_score(test_data["adverse_outcome"], final_probas)
+        final_pr = average_precision_score(test_data["adverse_outcome"], final_probas)
+
+        logger.info("====== REAL WORLD TEST RESULTS ======")
+        logger.info(f"ROC-AUC on Real Data: {final_auc:.4f}")
+        logger.info(f"PR-AUC on Real Data: {final_pr:.4f}")
+        logger.info("=====================================")
+
+        # 6. Investigate Feature Importance
+        try:
+            logger.info("Calculating Feature Importance (this may take a while)...")
+            importance = adverse_outcome_model.tabpfnv2_predictor.feature_importance(
+                test_data,
+            )
+            logger.info(f"Feature Importance:\n{importance}")
+            importance.to_excel(
+                f"{adverse_outcome_model.model_path}_feature_importance.xlsx",
+                index=False,
+            )
+        except Exception as e:
+            logger.warning(f"Could not calculate feature importance: {e}")
+    finally:
+        adverse_outcome_model.cleanup_scratch()
 
     # 7. Check for potential overlap/leakage
     # Check if any rows in test_data are identical to train_data (ignoring target)
@@ -204,3 +395,19 @@ if __name__ == "__main__":
         )
     else:
         logger.info("No exact row duplicates found between Train and Test sets.")
+
+
+if __name__ == "__main__":
+    # Guarded entry point: joblib's loky workers re-import this module, so
+    # the pipeline must only run for the top-level invocation
+    parser = argparse.ArgumentParser(
+        description="Train and validate the adverse-outcome model.",
+    )
+    parser.add_argument(
+        "--sampling-method",
+        choices=("smote", "adasyn"),
+        default="smote",
+        help="Which resampled training dataset to use",
+    )
+    args = parser.parse_args()
+    main(data_synthetic_method=args.sampling_method)
@@ -1,31 +1,90 @@
+import asyncio
+import logging
 import os
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Literal
 
+import httpx
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
 
-from ml.inference import load_predictor, predict
+from ml.inference import PredictProbaBatcher, load_predictor, predict, predict_async
 from plaque_risk_explorer.executive_summary import generate_executive_summary
 
 load_dotenv()
 
+LOGGER = logging.getLogger(__name__)
+
 _BACKEND_ROOT = Path(__file__).resolve().parents[2]
 _MODEL_DIR = Path(os.getenv("MODEL_DIR", str(_BACKEND_ROOT / "models")))
 
+if os.getenv("PRELOAD_MODEL"):
+    # Under gunicorn --preload this import runs once in the master process,
+    # so the lru-cached predictor is shared copy-on-write across forked
+    # workers and each worker's lifespan load becomes a cache hit
+    load_predictor(_MODEL_DIR)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Size the pool behind asyncio.to_thread (the loop's default executor,
+    # used by the batcher, startup load, and warm-up) to the host: inference
+    # calls release the GIL inside native code, so more workers let batched
+    # model dispatches overlap on multi-core machines
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(
+            max_workers=int(os.getenv("THREAD_LIMIT", str((os.cpu_count() or 1) * 4))),
+            thread_name_prefix="inference",
+        ),
+    )
     try:
-        app.state.predictor, app.state.reference_profile = load_predictor(_MODEL_DIR)
+        # Deserializing the AutoGluon artifacts is blocking; run it in a
+        # worker thread so the loop stays responsive during startup
+        (
+            app.state.predictor,
+            app.state.reference_profile,
+            app.state.baseline_probability,
+        ) = await asyncio.to_thread(load_predictor, _MODEL_DIR)
+        # Coalescing window and batch cap for concurrent predict_proba calls;
+        # the defaults trade up to 10 ms of latency for one model dispatch
+        app.state.batcher = PredictProbaBatcher(
+            app.state.predictor,
+            max_delay=float(os.getenv("BATCH_MAX_DELAY_MS", "10")) / 1000.0,
+            max_rows=int(os.getenv("BATCH_MAX_ROWS", "64")),
+        )
     except Exception as exc:
         raise RuntimeError(
             f"Failed to load model from {_MODEL_DIR}. Run the training pipeline first.",
         ) from exc
-    yield
+    try:
+        # One synthetic prediction with the default profile primes native
+        # thread pools, page tables, and the 16-row counterfactual batch
+        # shape, so the first real request skips the cold-start spike
+        await asyncio.to_thread(
+            predict,
+            app.state.predictor,
+            app.state.reference_profile,
+            app.state.baseline_probability,
+            PredictionRequest().model_dump(),
+        )
+    except Exception as exc:
+        LOGGER.warning("Predictor warm-up failed: %s", exc)
+    # Shared outbound client: connection setup and TLS are amortized across
+    # Gemini calls instead of paid per request
+    app.state.http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    )
+    try:
+        yield
+    finally:
+        await app.state.http_client.aclose()
 
 
 app = FastAPI(
@@ -33,6 +92,9 @@ app = FastAPI(
     description="Association of Clinical Factors and Plaque Morphology with Adverse Cardiovascular Outcomes",
     version="0.1.0",
     lifespan=lifespan,
+    # orjson serializes the nested response (explanation dict included)
+    # several times faster than stdlib json
+    default_response_class=ORJSONResponse,
 )
 
 default_origins = [
@@ -40,13 +102,18 @@ default_origins = [
     "http://127.0.0.1:3000",
 ]
 cors_origins_env = os.getenv("CORS_ORIGINS", "")
-env_origins = [
-    origin.strip() for origin in cors_origins_env.split(",") if origin.strip()
-]
+if cors_origins_env:
+    default_origins += [
+        origin.strip() for origin in cors_origins_env.split(",") if origin.strip()
+    ]
+
+# Order-preserving dedup in one dict pass, frozen into a tuple so the
+# allow-list is computed exactly once per process
+_ALLOWED_ORIGINS: tuple[str, ...] = tuple(dict.fromkeys(default_origins))
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=list(dict.fromkeys(default_origins + env_origins)),
+    allow_origins=_ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -54,6 +121,10 @@ app.add_middleware(
 
 
 class PredictionRequest(BaseModel):
+    # frozen + forbid keeps validation strict and the instance immutable,
+    # which also lets Pydantic skip mutation bookkeeping
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     # Clinical features
     gender: Literal["female", "male"] = "male"
     age: int = Field(62, ge=30, le=95)
@@ -94,46 +165,163 @@ class PredictionResponse(BaseModel):
     explanation: dict[str, object]
 
 
+class BatchPredictionRequest(BaseModel):
+    items: list[PredictionRequest] = Field(min_length=1, max_length=64)
+
+
+class BatchPredictionResponse(BaseModel):
+    items: list[PredictionResponse]
+
+
+# Force the pydantic-core validator/serializer build for every model at
+# import (i.e. in the gunicorn master under --preload) so no request pays
+# first-use schema compilation
+for _model in (
+    PredictionRequest,
+    BinaryTargetPrediction,
+    ExecutiveSummary,
+    PredictionResponse,
+    BatchPredictionRequest,
+    BatchPredictionResponse,
+):
+    _model.model_rebuild(force=True)
+
+
+# LRU of (probability, prediction, explanation) keyed on the canonicalized
+# payload: clinician what-if exploration replays the same vectors often, and
+# a hit skips the whole inference + explanation pipeline. The handler runs on
+# a single event loop, so no lock is needed.
+_PREDICTION_CACHE: OrderedDict[
+    tuple,
+    tuple[float, int, dict[str, object]],
+] = OrderedDict()
+_PREDICTION_CACHE_MAX = 4096
+_prediction_cache_hits = 0
+_prediction_cache_misses = 0
+
+
+# Field order frozen at import; getattr over this tuple skips model_dump's
+# per-field serializer dispatch when building the features dict
+_REQUEST_FIELDS = tuple(PredictionRequest.model_fields)
+
+
+def _prediction_cache_key(features: dict[str, object]) -> tuple:
+    # Floats rounded to 3 decimals to widen the hit rate across UI noise
+    return tuple(
+        (name, round(value, 3) if isinstance(value, float) else value)
+        for name, value in sorted(features.items())
+    )
+
+
+# Tier boundaries as a sorted tuple so classification is one C-level bisect
+# instead of chained comparisons; probability >= threshold maps to the
+# right-hand tier, matching bisect_right semantics
+_TIER_NAMES: tuple[Literal["low", "moderate", "high"], ...] = (
+    "low",
+    "moderate",
+    "high",
+)
+_TIER_THRESHOLDS = (0.35, 0.65)
+
+
 def _risk_tier(probability: float) -> Literal["low", "moderate", "high"]:
-    if probability >= 0.65:
-        return "high"
-    if probability >= 0.35:
-        return "moderate"
-    return "low"
+    return _TIER_NAMES[bisect_right(_TIER_THRESHOLDS, probability)]
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "prediction_cache": {
+            "size": len(_PREDICTION_CACHE),
+            "hits": _prediction_cache_hits,
+            "misses": _prediction_cache_misses,
+        },
+    }
 
 
-@app.post("/predict", response_model=PredictionResponse)
-async def predict_adverse_outcome(payload: PredictionRequest):
-    """Predict adverse cardiovascular outcome probability."""
-    try:
-        probability, prediction, explanation = predict(
-            app.state.predictor,
-            app.state.reference_profile,
-            payload.model_dump(),
-        )
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+@app.post("/cache/clear")
+async def clear_prediction_cache():
+    """Drop all cached predictions (e.g. after swapping the model)."""
+    global _prediction_cache_hits, _prediction_cache_misses
+    _PREDICTION_CACHE.clear()
+    _prediction_cache_hits = 0
+    _prediction_cache_misses = 0
+    return {"status": "cleared"}
+
+
+async def _predict_one(payload: PredictionRequest) -> dict[str, object]:
+    global _prediction_cache_hits, _prediction_cache_misses
+    # Built once via direct attribute reads (cheaper than model_dump) and
+    # shared between prediction and summary generation
+    features = {name: getattr(payload, name) for name in _REQUEST_FIELDS}
+    cache_key = _prediction_cache_key(features)
+    cached = _PREDICTION_CACHE.get(cache_key)
+    if cached is not None:
+        _PREDICTION_CACHE.move_to_end(cache_key)
+        _prediction_cache_hits += 1
+        probability, prediction, explanation = cached
+    else:
+        try:
+            probability, prediction, explanation = await predict_async(
+                app.state.batcher,
+                app.state.reference_profile,
+                app.state.baseline_probability,
+                features,
+            )
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=str(exc)) from exc
+        _prediction_cache_misses += 1
+        _PREDICTION_CACHE[cache_key] = (probability, prediction, explanation)
+        while len(_PREDICTION_CACHE) > _PREDICTION_CACHE_MAX:
+            _PREDICTION_CACHE.popitem(last=False)
 
     tier = _risk_tier(probability)
-    executive_summary = generate_executive_summary(
-        patient_features=payload.model_dump(),
+    executive_summary = await generate_executive_summary(
+        patient_features=features,
         probability=probability,
         risk_tier=tier,
         explanation=explanation,
+        http_client=app.state.http_client,
     )
 
-    return PredictionResponse(
-        adverse_outcome=BinaryTargetPrediction(
-            probability=probability,
-            prediction=prediction,
-            risk_tier=tier,
-        ),
-        executive_summary=executive_summary,
-        explanation=explanation,
-    )
+    return {
+        "adverse_outcome": {
+            "probability": probability,
+            "prediction": prediction,
+            "risk_tier": tier,
+        },
+        "executive_summary": executive_summary,
+        "explanation": explanation,
+    }
+
+
+# Plain dicts of trusted primitives go straight to the orjson serializer;
+# the response models are kept only as the documented OpenAPI schema
+@app.post(
+    "/predict",
+    response_model=None,
+    responses={200: {"model": PredictionResponse}},
+)
+async def predict_adverse_outcome(payload: PredictionRequest) -> dict[str, object]:
+    """Predict adverse cardiovascular outcome probability."""
+    return await _predict_one(payload)
+
+
+@app.post(
+    "/predict_batch",
+    response_model=None,
+    responses={200: {"model": BatchPredictionResponse}},
+)
+async def predict_adverse_outcome_batch(
+    payload: BatchPredictionRequest,
+) -> dict[str, object]:
+    """Predict adverse cardiovascular outcomes for a batch of patients.
+
+    Items are scored concurrently, so PredictProbaBatcher coalesces all of
+    their counterfactual rows into a single predict_proba call instead of
+    one model dispatch per patient.
+    """
+    items = await asyncio.gather(*(_predict_one(item) for item in payload.items))
+    return {"items": list(items)}
@@ -0,0 +1,18 @@
+import os
+
+from uvicorn.workers import UvicornWorker
+
+
+class LimitedConcurrencyWorker(UvicornWorker):
+    """UvicornWorker with a concurrency ceiling for load shedding.
+
+    Once ``LIMIT_CONCURRENCY`` requests are in flight, uvicorn answers 503
+    immediately instead of queueing work behind the inference thread pool,
+    keeping p99 latency bounded under overload.
+    """
+
+    CONFIG_KWARGS = {
+        **UvicornWorker.CONFIG_KWARGS,
+        "limit_concurrency": int(os.getenv("LIMIT_CONCURRENCY", "64")),
+        "backlog": int(os.getenv("UVICORN_BACKLOG", "2048")),
+    }